@@ -7,5 +7,8 @@ __all__ = [
     "history",
     "input_validators",
     "operations",
+    "replay",
+    "result_cache",
+    "sessions",
     "logger",
 ]
@@ -10,6 +10,7 @@ class Calculation:
     b: Decimal
     result: Decimal
     timestamp: str  
+    digest: str = ""    # content hash of inputs + config the result was computed under
 
     @staticmethod
     def now_iso() -> str:
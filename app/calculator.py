@@ -1,5 +1,7 @@
 from __future__ import annotations
-from typing import List
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
 from decimal import Decimal
 import pandas as pd
 
@@ -9,54 +11,142 @@ from .calculator_memento import CalculatorMemento
 from .exceptions import OperationError, ValidationError, CalculatorError
 from .input_validators import validate_two_numbers, apply_precision
 from .operations import OperationFactory
-from .history import HistoryObserver, LoggingObserver, AutoSaveObserver
+from .history import HistoryObserver, LoggingObserver, AutoSaveObserver, iter_history_csv
+from .replay import ReplayReport, calculation_digest, replay_history
+from .result_cache import ResultCache
 from .logger import get_logger
 
+_EMPTY_LIST = sys.getsizeof([])
+_POINTER = 8
+_MEMENTO = sys.getsizeof(CalculatorMemento([], 0))
+
+def _list_size(n: int) -> int:
+    return _EMPTY_LIST + _POINTER * n
+
+def _record_size(c: Calculation) -> int:
+    return sys.getsizeof(c) + sys.getsizeof(vars(c)) + sum(
+        sys.getsizeof(v) for v in (c.operation, c.a, c.b, c.result, c.timestamp, c.digest)
+    )
+
+def _buffer_size(buf: List[Calculation]) -> int:
+    return _list_size(len(buf)) + sum(_record_size(c) for c in buf)
+
 class Calculator:
     """Calculator core with Factory ops, Memento undo/redo, and Observers."""
 
-    def __init__(self, cfg: CalculatorConfig | None = None):
+    def __init__(
+        self,
+        cfg: CalculatorConfig | None = None,
+        observers: Optional[List[HistoryObserver]] = None,
+        result_cache: Optional[ResultCache] = None,
+        history_file: Optional[Path] = None,
+    ):
         self.cfg = cfg or CalculatorConfig.load()
+        self.history_file = history_file or self.cfg.history_file
         self._logger = get_logger()
-        self._history: List[Calculation] = []
+        # history is the first `_length` items of `_entries`; mementos share the buffer
+        self._entries: List[Calculation] = []
+        self._length = 0
         self._past: List[CalculatorMemento] = []   # undo stack
         self._future: List[CalculatorMemento] = [] # redo stack
-        self._observers: List[HistoryObserver] = [
-            LoggingObserver(self._logger),
-            AutoSaveObserver(),
-        ]
+        self._result_cache = ResultCache(self.cfg.result_cache_size) if result_cache is None else result_cache
+        # id(buffer) -> [buffer, refs, bytes]; refs = mementos + live history using it
+        self._buffers: Dict[int, List[Any]] = {}
+        self._buffer_bytes = 0
+        self._ref(self._entries)
+        if observers is None:
+            observers = [LoggingObserver(self._logger), AutoSaveObserver(self.history_file)]
+        self._observers: List[HistoryObserver] = list(observers)
 
     # ----- Observer management -----
     def register_observer(self, obs: HistoryObserver) -> None:
         self._observers.append(obs)     # pragma: no cover
 
     def _notify(self, calc: Calculation) -> None:
+        # after an append the live history is the whole buffer, so no copy is needed
         for obs in self._observers:
-            obs.on_new_calculation(calc, self._history, self.cfg)
+            obs.on_new_calculation(calc, self._entries, self.cfg)
+
+    # ----- Size accounting -----
+    def _ref(self, buf: List[Calculation]) -> None:
+        slot = self._buffers.get(id(buf))
+        if slot is None:
+            size = _buffer_size(buf)
+            self._buffers[id(buf)] = [buf, 1, size]
+            self._buffer_bytes += size
+        else:
+            slot[1] += 1
+
+    def _unref(self, buf: List[Calculation]) -> None:
+        slot = self._buffers[id(buf)]
+        slot[1] -= 1
+        if slot[1] == 0:
+            del self._buffers[id(buf)]
+            self._buffer_bytes -= slot[2]
+
+    def _resize(self, buf: List[Calculation], delta: int) -> None:
+        self._buffers[id(buf)][2] += delta
+        self._buffer_bytes += delta
 
     # ----- Memento helpers -----
     def _snapshot(self) -> CalculatorMemento:
-        return CalculatorMemento(history=list(self._history))
+        self._ref(self._entries)
+        return CalculatorMemento(entries=self._entries, length=self._length)
+
+    def _drop(self, m: CalculatorMemento) -> None:
+        self._unref(m.entries)
+
+    def _set_current(self, buf: List[Calculation], length: int) -> None:
+        self._ref(buf)
+        self._unref(self._entries)
+        self._entries, self._length = buf, length
 
     def _restore(self, m: CalculatorMemento) -> None:
-        self._history = list(m.history)
+        self._set_current(m.entries, m.length)
+        self._drop(m)
+
+    def _push_undo(self) -> None:
+        """Snapshot current history onto the undo stack and drop the redo stack."""
+        self._past.append(self._snapshot())
+        for m in self._future:
+            self._drop(m)
+        self._future.clear()
+
+    def _make_appendable(self) -> None:
+        """Ensure the live history ends the buffer so perform() can append in place."""
+        buf, n = self._entries, self._length
+        if n == len(buf):
+            return
+        if any(m.entries is buf and m.length > n for m in self._past):
+            self._set_current(buf[:n], n)   # pragma: no cover  (tail still needed by an undo snapshot)
+        else:
+            self._resize(buf, -sum(_POINTER + _record_size(c) for c in buf[n:]))
+            del buf[n:]
+
+    def _commit_history(self, new_hist: List[Calculation]) -> None:
+        """Replace the whole history as a single undoable step."""
+        self._push_undo()
+        buf = list(new_hist)
+        self._set_current(buf, len(buf))
 
     # ----- Public API -----
     @property
     def history(self) -> List[Calculation]:
-        return list(self._history)
+        return self._entries[:self._length]
 
     def clear(self) -> None:
-        if self._history:
-            self._past.append(self._snapshot())
-            self._future.clear()
-            self._history.clear()
+        if self._length:
+            self._push_undo()
+            self._set_current([], 0)
 
     def perform(self, op_name: str, a, b):
         da, db = validate_two_numbers(a, b, self.cfg)
-        op = OperationFactory.create(op_name)
-        res = op.execute(da, db, self.cfg)
-        res = apply_precision(res, self.cfg)
+        key = calculation_digest(op_name, da, db, self.cfg)
+        res = self._result_cache.get(key)
+        if res is None:
+            op = OperationFactory.create(op_name)
+            res = apply_precision(op.execute(da, db, self.cfg), self.cfg)
+            self._result_cache[key] = res
 
         calc = Calculation(
             operation=op_name,
@@ -64,12 +154,15 @@ class Calculator:
             b=db,
             result=res,
             timestamp=Calculation.now_iso(),
+            digest=key,
         )
 
         # push memento then mutate
-        self._past.append(self._snapshot())
-        self._future.clear()
-        self._history.append(calc)
+        self._push_undo()
+        self._make_appendable()
+        self._entries.append(calc)
+        self._length += 1
+        self._resize(self._entries, _POINTER + _record_size(calc))
 
         # notify observers (log + autosave)
         self._notify(calc)
@@ -78,54 +171,84 @@ class Calculator:
     def undo(self) -> bool:
         if not self._past:
             return False        # pragma: no cover
-        current = self._snapshot()
-        last = self._past.pop()
-        self._future.append(current)
-        self._restore(last)
+        self._future.append(self._snapshot())
+        self._restore(self._past.pop())
         return True
 
     def redo(self) -> bool:
         if not self._future:
             return False        # pragma: no cover
-        current = self._snapshot()
-        nxt = self._future.pop()
-        self._past.append(current)
-        self._restore(nxt)
+        self._past.append(self._snapshot())
+        self._restore(self._future.pop())
         return True
 
+    def replay(
+        self,
+        cfg: CalculatorConfig | None = None,
+        source: Optional[Path] = None,
+        max_workers: Optional[int] = None,
+        force: bool = False,
+    ) -> ReplayReport:
+        """Recompute history under `cfg` and commit it as one undoable step.
+
+        Replays the in-memory history, or streams `source` from disk when given.
+        Entries already computed under `cfg` are skipped unless `force` is set.
+        Observers are not notified per entry; the history file is rewritten once
+        if auto-save is enabled.
+        """
+        cfg = cfg or self.cfg
+        history = iter_history_csv(source, cfg.default_encoding) if source else self.history
+        report = replay_history(history, cfg, cache=self._result_cache, max_workers=max_workers, force=force)
+        self._commit_history(report.history)
+        if self.cfg.auto_save:
+            self.save()
+        return report
+
+    # ----- State export (used by SessionManager) -----
+    def dump_state(self) -> Dict[str, Any]:
+        return {
+            "current": CalculatorMemento(entries=self._entries, length=self._length),
+            "past": list(self._past),
+            "future": list(self._future),
+        }
+
+    def load_state(self, state: Dict[str, Any]) -> None:
+        current: CalculatorMemento = state["current"]
+        self._entries, self._length = current.entries, current.length
+        self._past = list(state["past"])
+        self._future = list(state["future"])
+        self._buffers = {}
+        self._buffer_bytes = 0
+        for m in [current] + self._past + self._future:
+            self._ref(m.entries)
+
+    def memory_footprint(self) -> int:
+        """Approximate bytes held by history and undo/redo stacks.
+
+        Kept as a running total, so this is O(1). Records shared by two
+        buffers (e.g. after a replay) are counted once per buffer.
+        """
+        mementos = len(self._past) + len(self._future)
+        return (
+            self._buffer_bytes + _MEMENTO * mementos
+            + _list_size(len(self._past)) + _list_size(len(self._future))
+        )
+
     # ----- Persistence -----
     def save(self) -> None:
         from .history import AutoSaveObserver
         try:
-            df = AutoSaveObserver.history_to_df(self._history)
-            df.to_csv(self.cfg.history_file, index=False, encoding=self.cfg.default_encoding)
+            df = AutoSaveObserver.history_to_df(self.history)
+            df.to_csv(self.history_file, index=False, encoding=self.cfg.default_encoding)
         except Exception as e:      # pragma: no cover
             raise OperationError(f"Failed to save history: {e}")        # pragma: no cover
 
     def load(self) -> None:
         try:
-            df = pd.read_csv(self.cfg.history_file, encoding=self.cfg.default_encoding)
+            df = pd.read_csv(self.history_file, encoding=self.cfg.default_encoding)
         except FileNotFoundError:
             raise OperationError("No history file found to load")
         except Exception as e:   # pragma: no cover
             raise OperationError(f"Failed to load history: {e}")    # pragma: no cover
 
-        required = {"timestamp", "operation", "a", "b", "result"}
-        if not required.issubset(set(df.columns)):
-            raise OperationError("Malformed history CSV: missing columns")  # pragma: no cover
-
-        new_hist: List[Calculation] = []
-        for _, row in df.iterrows():
-            new_hist.append(
-                Calculation(
-                    operation=str(row["operation"]),
-                    a=Decimal(str(row["a"])),
-                    b=Decimal(str(row["b"])),
-                    result=Decimal(str(row["result"])),
-                    timestamp=str(row["timestamp"]),
-                )
-            )
-
-        self._past.append(self._snapshot())
-        self._future.clear()
-        self._history = new_hist
+        self._commit_history(AutoSaveObserver.df_to_history(df))
@@ -17,6 +17,12 @@ class CalculatorConfig:
     precision: int
     max_input_value: float
     default_encoding: str
+    session_memory_budget: int = 64 * 1024 * 1024
+    result_cache_size: int = 1024
+
+    @property
+    def sessions_dir(self) -> Path:
+        return self.history_dir / "sessions"
 
     @property
     def log_file(self) -> Path:
@@ -35,6 +41,8 @@ class CalculatorConfig:
         precision = int(_get("CALCULATOR_PRECISION", "8"))
         max_input_value = float(_get("CALCULATOR_MAX_INPUT_VALUE", "1e12"))
         default_encoding = _get("CALCULATOR_DEFAULT_ENCODING", "utf-8")
+        session_memory_budget = int(_get("CALCULATOR_SESSION_MEMORY_BUDGET", str(64 * 1024 * 1024)))
+        result_cache_size = int(_get("CALCULATOR_RESULT_CACHE_SIZE", "1024"))
 
         log_dir.mkdir(parents=True, exist_ok=True)
         history_dir.mkdir(parents=True, exist_ok=True)
@@ -47,4 +55,6 @@ class CalculatorConfig:
             precision=precision,
             max_input_value=max_input_value,
             default_encoding=default_encoding,
+            session_memory_budget=session_memory_budget,
+            result_cache_size=result_cache_size,
         )
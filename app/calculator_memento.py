@@ -4,5 +4,14 @@ from .calculation import Calculation
 
 @dataclass(frozen=True)
 class CalculatorMemento:
-    """Snapshot of the calculator's history state for undo/redo."""
-    history: List[Calculation]
+    """Snapshot of the calculator's history state for undo/redo.
+
+    `entries` is shared with the live history and other snapshots; only the
+    first `length` items belong to this one, so a snapshot costs O(1).
+    """
+    entries: List[Calculation]
+    length: int
+
+    @property
+    def history(self) -> List[Calculation]:
+        return self.entries[:self.length]
@@ -1,8 +1,35 @@
 from abc import ABC, abstractmethod
-from typing import List
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional
 import pandas as pd
 from .calculation import Calculation
 from .calculator_config import CalculatorConfig
+from .exceptions import OperationError
+
+HISTORY_COLUMNS = ("timestamp", "operation", "a", "b", "result")
+
+def calculation_to_row(c: Calculation) -> Dict[str, str]:
+    return {
+        "timestamp": c.timestamp,
+        "operation": c.operation,
+        "a": str(c.a),
+        "b": str(c.b),
+        "result": str(c.result),
+        "digest": c.digest,
+    }
+
+def row_to_calculation(row: Mapping[str, Any]) -> Calculation:
+    # older history files have no digest column; pandas fills gaps with NaN
+    digest = row.get("digest", "")
+    return Calculation(
+        operation=str(row["operation"]),
+        a=Decimal(str(row["a"])),
+        b=Decimal(str(row["b"])),
+        result=Decimal(str(row["result"])),
+        timestamp=str(row["timestamp"]),
+        digest=digest if isinstance(digest, str) else "",
+    )
 
 class HistoryObserver(ABC):
     """Observer notified whenever a new calculation is appended."""
@@ -20,26 +47,37 @@ class LoggingObserver(HistoryObserver):
         )
 
 class AutoSaveObserver(HistoryObserver):
+    def __init__(self, history_file: Optional[Path] = None):
+        self._history_file = history_file   # defaults to cfg.history_file
+
     def on_new_calculation(self, calc: Calculation, all_history: List[Calculation], cfg: CalculatorConfig) -> None:
         if not cfg.auto_save:
             return  # pragma: no cover
         try:
             df = self.history_to_df(all_history)
-            df.to_csv(cfg.history_file, index=False, encoding=cfg.default_encoding)
+            df.to_csv(self._history_file or cfg.history_file, index=False, encoding=cfg.default_encoding)
         except Exception:   # pragma: no cover
             # observer shouldn't crash the app
             pass  # pragma: no cover
 
     @staticmethod
     def history_to_df(history: List[Calculation]) -> pd.DataFrame:
-        rows = [
-            {
-                "timestamp": c.timestamp,
-                "operation": c.operation,
-                "a": str(c.a),
-                "b": str(c.b),
-                "result": str(c.result),
-            }
-            for c in history
-        ]
-        return pd.DataFrame(rows)
+        return pd.DataFrame([calculation_to_row(c) for c in history])
+
+    @staticmethod
+    def df_to_history(df: pd.DataFrame) -> List[Calculation]:
+        if not set(HISTORY_COLUMNS).issubset(set(df.columns)):
+            raise OperationError("Malformed history CSV: missing columns")  # pragma: no cover
+        return [row_to_calculation(row) for _, row in df.iterrows()]
+
+def iter_history_csv(path: Path, encoding: str = "utf-8", chunksize: int = 1000) -> Iterator[Calculation]:
+    """Stream calculations from a history CSV without loading it all at once."""
+    try:
+        reader = pd.read_csv(path, encoding=encoding, chunksize=chunksize, dtype=str)
+    except FileNotFoundError:
+        raise OperationError("No history file found to load")
+    except pd.errors.EmptyDataError:
+        raise OperationError("History file is empty")
+    with reader:
+        for chunk in reader:
+            yield from AutoSaveObserver.df_to_history(chunk)
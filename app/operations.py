@@ -79,10 +79,15 @@ class OperationFactory:
         "percent": Percentage,
         "abs_diff": AbsoluteDifference,
     }
+    # operations are stateless, so one shared instance per name is enough
+    _instances: Dict[str, Operation] = {}
 
     @classmethod
     def create(cls, name: str) -> Operation:
-        op_cls = cls._registry.get(name)
-        if not op_cls:
-            raise OperationError(f"Unknown operation: {name}")
-        return op_cls()
+        op = cls._instances.get(name)
+        if op is None:
+            op_cls = cls._registry.get(name)
+            if not op_cls:
+                raise OperationError(f"Unknown operation: {name}")
+            op = cls._instances[name] = op_cls()
+        return op
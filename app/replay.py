@@ -0,0 +1,149 @@
+from __future__ import annotations
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from decimal import Decimal, DecimalException
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
+import pandas as pd
+
+from .calculation import Calculation
+from .calculator_config import CalculatorConfig
+from .exceptions import CalculatorError
+from .input_validators import validate_two_numbers, apply_precision
+from .operations import OperationFactory
+from .result_cache import ResultCache
+
+REPLAY_CHUNKSIZE = 2000     # entries pulled from the source per batch
+PARALLEL_THRESHOLD = 256    # below this many jobs a process pool costs more than it saves
+
+def calculation_digest(operation: str, a: Decimal, b: Decimal, cfg: CalculatorConfig) -> str:
+    """Content hash of everything that determines a calculation's result."""
+    key = f"{operation}|{a}|{b}|{cfg.precision}|{cfg.max_input_value}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+def _evaluate(job: Tuple[str, str, Decimal, Decimal, CalculatorConfig]) -> Tuple[str, Optional[Decimal], Optional[str]]:
+    """Recompute one unique calculation; runs inside worker processes."""
+    digest, operation, a, b, cfg = job
+    try:
+        da, db = validate_two_numbers(a, b, cfg)
+        res = OperationFactory.create(operation).execute(da, db, cfg)
+        return digest, apply_precision(res, cfg), None
+    except CalculatorError as e:
+        return digest, None, str(e)
+    except DecimalException as e:
+        # e.g. quantize needing more digits than the decimal context allows
+        return digest, None, f"Decimal error: {type(e).__name__}"
+
+@dataclass(frozen=True)
+class ReplayChange:
+    """A history entry whose result differs after replay."""
+    index: int
+    operation: str
+    a: Decimal
+    b: Decimal
+    old_result: Decimal
+    new_result: Decimal
+
+@dataclass
+class ReplayReport:
+    """Outcome of a replay: the recomputed history plus a diff of what changed."""
+    history: List[Calculation]
+    changes: List[ReplayChange] = field(default_factory=list)
+    errors: Dict[int, str] = field(default_factory=dict)
+    evaluated: int = 0
+    skipped: int = 0
+
+    def to_df(self) -> pd.DataFrame:
+        rows = [
+            {
+                "index": ch.index,
+                "operation": ch.operation,
+                "a": str(ch.a),
+                "b": str(ch.b),
+                "old_result": str(ch.old_result),
+                "new_result": str(ch.new_result),
+            }
+            for ch in self.changes
+        ]
+        return pd.DataFrame(rows, columns=["index", "operation", "a", "b", "old_result", "new_result"])
+
+def replay_history(
+    history: Iterable[Calculation],
+    cfg: CalculatorConfig,
+    cache: Optional[ResultCache] = None,
+    max_workers: Optional[int] = None,
+    force: bool = False,
+    chunksize: int = REPLAY_CHUNKSIZE,
+    parallel_threshold: int = PARALLEL_THRESHOLD,
+) -> ReplayReport:
+    """Re-evaluate every calculation in `history` under `cfg`.
+
+    `history` is consumed in chunks, so a streamed CSV is never held twice.
+    Entries whose stored digest already matches `cfg` are kept as-is unless
+    `force` is set (e.g. after fixing an operation), which also bypasses
+    `cache`. Duplicates and cached results are not recomputed; larger batches
+    of remaining entries are evaluated in parallel across processes. Entries
+    that now fail keep their old result and are reported in `errors`.
+    Original timestamps are preserved.
+    """
+    cache = ResultCache() if cache is None else cache
+    workers = max_workers or os.cpu_count() or 1
+    report = ReplayReport(history=[])
+    pool: Optional[ProcessPoolExecutor] = None
+    source = iter(history)
+    offset = 0
+    try:
+        while True:
+            chunk = list(islice(source, chunksize))
+            if not chunk:
+                break
+            digests = [calculation_digest(c.operation, c.a, c.b, cfg) for c in chunk]
+
+            results: Dict[str, Decimal] = {}
+            pending: Dict[str, Tuple[str, str, Decimal, Decimal, CalculatorConfig]] = {}
+            for c, d in zip(chunk, digests):
+                if (c.digest == d and not force) or d in results or d in pending:
+                    continue
+                cached = None if force else cache.get(d)
+                if cached is not None:
+                    results[d] = cached
+                else:
+                    pending[d] = (d, c.operation, c.a, c.b, cfg)
+
+            jobs = list(pending.values())
+            if workers > 1 and len(jobs) >= max(parallel_threshold, 2):
+                if pool is None:
+                    pool = ProcessPoolExecutor(max_workers=workers)
+                outcomes = pool.map(_evaluate, jobs, chunksize=max(1, len(jobs) // (workers * 4)))
+            else:
+                outcomes = map(_evaluate, jobs)
+
+            failures: Dict[str, str] = {}
+            for d, res, err in outcomes:
+                if err is None:
+                    results[d] = cache[d] = res
+                else:
+                    failures[d] = err
+            report.evaluated += len(jobs)
+
+            for i, (c, d) in enumerate(zip(chunk, digests), offset):
+                if c.digest == d and not force:
+                    report.history.append(c)
+                    continue
+                if d in failures:
+                    report.errors[i] = failures[d]
+                    report.history.append(c)
+                    continue
+                new_res = results[d]
+                if str(new_res) != str(c.result):
+                    report.changes.append(ReplayChange(i, c.operation, c.a, c.b, c.result, new_res))
+                report.history.append(replace(c, result=new_res, digest=d))
+            offset += len(chunk)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    report.skipped = offset - report.evaluated
+    return report
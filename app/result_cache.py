@@ -0,0 +1,45 @@
+import sys
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Optional
+
+# per-entry cost of the OrderedDict slot and its linked-list node (approximate)
+_ENTRY_OVERHEAD = 100
+
+class ResultCache:
+    """LRU map from calculation digest to result, bounded by entry count."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Decimal]" = OrderedDict()
+        self._bytes = 0
+
+    @staticmethod
+    def _entry_size(key: str, value: Decimal) -> int:
+        return sys.getsizeof(key) + sys.getsizeof(value) + _ENTRY_OVERHEAD
+
+    def get(self, key: str) -> Optional[Decimal]:
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key: str, value: Decimal) -> None:
+        old = self._data.pop(key, None)
+        if old is not None:
+            self._bytes -= self._entry_size(key, old)
+        self._data[key] = value
+        self._bytes += self._entry_size(key, value)
+        while len(self._data) > self.max_entries:
+            k, v = self._data.popitem(last=False)
+            self._bytes -= self._entry_size(k, v)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def memory_footprint(self) -> int:
+        """Approximate bytes held by cached entries."""
+        return sys.getsizeof(self._data) + self._bytes
@@ -0,0 +1,232 @@
+from __future__ import annotations
+import json
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .calculation import Calculation
+from .calculator import Calculator
+from .calculator_config import CalculatorConfig
+from .calculator_memento import CalculatorMemento
+from .exceptions import OperationError, ValidationError
+from .history import AutoSaveObserver, LoggingObserver, calculation_to_row, row_to_calculation
+from .logger import get_logger
+from .result_cache import ResultCache
+
+_SESSION_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+class _SpillEncoder:
+    """Spill-file encoder.
+
+    Each record is stored once in `rows`, each distinct history buffer once in
+    `buffers` as [start, length] runs into `rows`, and each memento as
+    [buffer index, length].
+    """
+
+    def __init__(self):
+        self.rows: List[Dict[str, str]] = []
+        self.buffers: List[List[List[int]]] = []
+        self._row_index: Dict[int, int] = {}
+        self._buffer_index: Dict[int, int] = {}
+
+    def memento(self, m: CalculatorMemento) -> List[int]:
+        i = self._buffer_index.get(id(m.entries))
+        if i is None:
+            i = self._buffer_index[id(m.entries)] = len(self.buffers)
+            self.buffers.append(self._runs(m.entries))
+        return [i, m.length]
+
+    def _runs(self, items: List[Calculation]) -> List[List[int]]:
+        out: List[List[int]] = []
+        for c in items:
+            i = self._row_index.get(id(c))
+            if i is None:
+                i = self._row_index[id(c)] = len(self.rows)
+                self.rows.append(calculation_to_row(c))
+            if out and out[-1][0] + out[-1][1] == i:
+                out[-1][1] += 1
+            else:
+                out.append([i, 1])
+        return out
+
+def _expand(runs: List[List[int]], records: List[Calculation]) -> List[Calculation]:
+    out: List[Calculation] = []
+    for start, length in runs:
+        out.extend(records[start:start + length])
+    return out
+
+class Session:
+    """Handle to a managed calculator.
+
+    Every attribute access or call goes through the manager, so the session is
+    rehydrated if it was evicted since the handle was obtained and writes are
+    never made to an evicted copy.
+    """
+
+    def __init__(self, manager: "SessionManager", session_id: str):
+        self._manager = manager
+        self.session_id = session_id
+
+    def __getattr__(self, name: str) -> Any:
+        # private/dunder lookups (copy, pickle) must not recurse into the manager
+        if name.startswith("_"):
+            raise AttributeError(name)
+        manager = self._manager
+        if callable(getattr(Calculator, name, None)):
+            def call(*args, **kwargs):
+                with manager._lock:
+                    try:
+                        return getattr(manager._checkout(self.session_id), name)(*args, **kwargs)
+                    finally:
+                        manager._remeasure(self.session_id)
+            return call
+        with manager._lock:
+            return getattr(manager._checkout(self.session_id), name)
+
+class SessionManager:
+    """Hosts many per-session calculators under an LRU memory budget.
+
+    Sessions share the config, a logging observer and a bounded result cache.
+    Each session saves (and, if `cfg.auto_save`, auto-saves) to its own
+    `cfg.sessions_dir/<id>.csv` rather than the shared history file. When
+    resident sessions exceed the budget, the least recently used ones are
+    written to `cfg.sessions_dir/<id>.json` and rehydrated on next use. The
+    result cache is bounded by `cfg.result_cache_size` instead of the budget.
+
+    Thread-safe: one lock guards the manager and every call made through a
+    `Session` handle, so calls on different sessions run one at a time.
+    """
+
+    def __init__(self, cfg: CalculatorConfig | None = None, memory_budget: Optional[int] = None):
+        self.cfg = cfg or CalculatorConfig.load()
+        self.memory_budget = self.cfg.session_memory_budget if memory_budget is None else memory_budget
+        self.result_cache = ResultCache(self.cfg.result_cache_size)
+        self._logging = LoggingObserver(get_logger())
+        self._sessions: "OrderedDict[str, Calculator]" = OrderedDict()  # LRU first
+        self._sizes: Dict[str, int] = {}
+        self._resident_bytes = 0
+        self._lock = threading.RLock()
+        self.cfg.sessions_dir.mkdir(parents=True, exist_ok=True)
+
+    def _spill_path(self, session_id: str) -> Path:
+        return self.cfg.sessions_dir / f"{session_id}.json"
+
+    # ----- Public API -----
+    @property
+    def resident_sessions(self) -> List[str]:
+        """Resident session ids, least recently used first."""
+        with self._lock:
+            return list(self._sessions)
+
+    def get(self, session_id: str) -> Session:
+        """Return a handle to the session, creating or rehydrating it as needed."""
+        if not _SESSION_ID.match(session_id):
+            raise ValidationError(f"Invalid session id: {session_id!r}")
+        with self._lock:
+            self._checkout(session_id)
+        return Session(self, session_id)
+
+    def evict(self, session_id: str) -> None:
+        """Write a resident session to disk and drop it from memory."""
+        with self._lock:
+            calc = self._sessions.pop(session_id, None)
+            if calc is None:
+                return
+            self._resident_bytes -= self._sizes.pop(session_id)
+            state = calc.dump_state()
+            enc = _SpillEncoder()
+            payload = {
+                "current": enc.memento(state["current"]),
+                "past": [enc.memento(m) for m in state["past"]],
+                "future": [enc.memento(m) for m in state["future"]],
+            }
+            payload["buffers"] = enc.buffers
+            payload["rows"] = enc.rows
+            try:
+                with open(self._spill_path(session_id), "w", encoding=self.cfg.default_encoding) as f:
+                    json.dump(payload, f)
+            except OSError as e:    # pragma: no cover
+                self._admit(session_id, calc)
+                raise OperationError(f"Failed to evict session {session_id}: {e}")
+
+    def evict_all(self) -> None:
+        with self._lock:
+            for sid in list(self._sessions):
+                self.evict(sid)
+
+    def memory_report(self) -> Dict[str, int]:
+        """Approximate bytes per resident session, least recently used first.
+
+        The shared result cache is reported separately by
+        `result_cache.memory_footprint()`.
+        """
+        with self._lock:
+            return {sid: self._sizes[sid] for sid in self._sessions}
+
+    def total_memory(self) -> int:
+        """Approximate bytes held by resident sessions plus the result cache."""
+        with self._lock:
+            return self._resident_bytes + self.result_cache.memory_footprint()
+
+    # ----- Internals (caller holds the lock) -----
+    def _admit(self, session_id: str, calc: Calculator) -> None:
+        self._sessions[session_id] = calc
+        self._sizes[session_id] = calc.memory_footprint()
+        self._resident_bytes += self._sizes[session_id]
+
+    def _remeasure(self, session_id: str) -> None:
+        calc = self._sessions.get(session_id)
+        if calc is None:
+            return  # pragma: no cover
+        size = calc.memory_footprint()
+        self._resident_bytes += size - self._sizes[session_id]
+        self._sizes[session_id] = size
+        self._enforce_budget(keep=session_id)
+
+    def _checkout(self, session_id: str) -> Calculator:
+        calc = self._sessions.get(session_id)
+        if calc is not None:
+            self._sessions.move_to_end(session_id)
+        else:
+            history_file = self.cfg.sessions_dir / f"{session_id}.csv"
+            calc = Calculator(
+                self.cfg,
+                observers=[self._logging, AutoSaveObserver(history_file)],
+                result_cache=self.result_cache,
+                history_file=history_file,
+            )
+            if self._spill_path(session_id).exists():
+                self._rehydrate(session_id, calc)
+            self._admit(session_id, calc)
+        self._enforce_budget(keep=session_id)
+        return calc
+
+    def _rehydrate(self, session_id: str, calc: Calculator) -> None:
+        path = self._spill_path(session_id)
+        try:
+            with open(path, encoding=self.cfg.default_encoding) as f:
+                payload: Dict[str, Any] = json.load(f)
+        except (OSError, ValueError) as e:  # pragma: no cover
+            raise OperationError(f"Failed to rehydrate session {session_id}: {e}")
+
+        records = [row_to_calculation(row) for row in payload["rows"]]
+        buffers = [_expand(runs, records) for runs in payload["buffers"]]
+
+        def memento(ref: List[int]) -> CalculatorMemento:
+            return CalculatorMemento(entries=buffers[ref[0]], length=ref[1])
+
+        calc.load_state({
+            "current": memento(payload["current"]),
+            "past": [memento(r) for r in payload["past"]],
+            "future": [memento(r) for r in payload["future"]],
+        })
+        path.unlink()
+
+    def _enforce_budget(self, keep: str) -> None:
+        while self._resident_bytes > self.memory_budget:
+            victim = next((sid for sid in self._sessions if sid != keep), None)
+            if victim is None:
+                return
+            self.evict(victim)
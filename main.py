@@ -23,6 +23,7 @@ HELP = """Commands:
   redo        - redo last undone change
   save        - save history to CSV
   load        - load history from CSV
+  replay      - recompute history under current config (replay force: recompute all)
   help        - show this help
   exit        - quit
 """
@@ -90,6 +91,19 @@ def main() -> int:
                 ColorOut.err(f"Load failed: {e}")
             continue
 
+        if cmd == "replay":
+            try:
+                report = calc.replay(force=parts[1:] == ["force"])
+            except CalculatorError as e:
+                ColorOut.err(f"Replay failed: {e}")
+                continue
+            for ch in report.changes:
+                ColorOut.info(f"{ch.index + 1}. {ch.operation}({ch.a},{ch.b}): {ch.old_result} -> {ch.new_result}")
+            for i, msg in report.errors.items():
+                ColorOut.err(f"{i + 1}. {msg}")
+            ColorOut.ok(f"Replay OK: {len(report.changes)} changed, {report.skipped} skipped.")
+            continue
+
         # Operations with two args
         if len(parts) == 3:
             op, a, b = parts[0], parts[1], parts[2]
@@ -0,0 +1,119 @@
+import pytest
+from dataclasses import replace
+from decimal import Decimal
+from app.calculation import Calculation
+from app.calculator import Calculator
+from app.calculator_config import CalculatorConfig
+from app.exceptions import CalculatorError
+from app.replay import replay_history, calculation_digest
+
+def make_calc(tmp_path, monkeypatch):
+    monkeypatch.setenv("CALCULATOR_HISTORY_DIR", str(tmp_path))
+    return Calculator(CalculatorConfig.load())
+
+def test_replay_new_precision_reports_changes():
+    cfg = replace(CalculatorConfig.load(), precision=2)
+    hist = [
+        Calculation("divide", Decimal(1), Decimal(3), Decimal("0.33333333"), "t1"),
+        Calculation("add", Decimal(1), Decimal(1), Decimal("2.00"), "t2"),
+    ]
+    report = replay_history(hist, cfg, max_workers=1)
+    assert [ch.index for ch in report.changes] == [0]
+    assert report.history[0].result == Decimal("0.33")
+    assert report.history[0].timestamp == "t1"
+    assert report.history[1].result == hist[1].result
+    assert report.history[1].digest == calculation_digest("add", Decimal(1), Decimal(1), cfg)
+    assert list(report.to_df()["new_result"]) == ["0.33"]
+
+def test_replay_skips_duplicates_and_cached():
+    cfg = CalculatorConfig.load()
+    calc = Calculation("add", Decimal(1), Decimal(2), Decimal(3), "t")
+    cache = {}
+    first = replay_history([calc, calc, calc], cfg, cache=cache, max_workers=1)
+    assert (first.evaluated, first.skipped) == (1, 2)
+    assert calculation_digest("add", Decimal(1), Decimal(2), cfg) in cache
+    second = replay_history([calc], cfg, cache=cache, max_workers=1)
+    assert (second.evaluated, second.skipped) == (0, 1)
+
+def test_replay_records_errors():
+    cfg = CalculatorConfig.load()
+    bad = Calculation("divide", Decimal(1), Decimal(0), Decimal(0), "t")
+    report = replay_history([bad], cfg, max_workers=1)
+    assert report.errors == {0: "Division by zero"}
+    assert report.history == [bad]
+
+def test_replay_parallel_matches_serial():
+    cfg = CalculatorConfig.load()
+    hist = [Calculation("power", Decimal(2), Decimal(n), Decimal(0), "t") for n in range(8)]
+    serial = replay_history(hist, cfg, max_workers=1)
+    parallel = replay_history(hist, cfg, max_workers=2, chunksize=3, parallel_threshold=0)
+    assert parallel.history == serial.history
+
+def test_calculator_replay_single_undo_step(tmp_path, monkeypatch):
+    c = make_calc(tmp_path, monkeypatch)
+    c.perform("divide", 2, 3)
+    c.perform("add", 1, 1)
+    before = c.history
+    report = c.replay(replace(c.cfg, precision=3), max_workers=1)
+    assert len(report.changes) == 2
+    assert c.history[0].result == Decimal("0.667")
+    assert c.undo() is True
+    assert c.history == before
+
+def test_calculator_replay_streams_file(tmp_path, monkeypatch):
+    c = make_calc(tmp_path, monkeypatch)
+    c.perform("multiply", 3, 4)
+    c.save()
+    c2 = make_calc(tmp_path, monkeypatch)
+    report = c2.replay(source=c.cfg.history_file, max_workers=1)
+    assert report.changes == []
+    assert len(c2.history) == 1
+    assert c2.history[0].result == Decimal("12.00000000")
+
+def test_calculator_replay_missing_file(tmp_path, monkeypatch):
+    c = make_calc(tmp_path, monkeypatch)
+    with pytest.raises(CalculatorError):
+        c.replay(source=tmp_path / "missing.csv", max_workers=1)
+
+def test_replay_decimal_overflow_is_reported(tmp_path, monkeypatch):
+    c = make_calc(tmp_path, monkeypatch)
+    c.perform("multiply", "1e6", "1e6")
+    report = c.replay(replace(c.cfg, precision=20), max_workers=1)
+    assert list(report.errors) == [0]
+    assert report.errors[0].startswith("Decimal error")
+    assert c.history[0].result == Decimal("1000000000000.00000000")
+
+def test_replay_skips_entries_with_unchanged_digest(tmp_path, monkeypatch):
+    c = make_calc(tmp_path, monkeypatch)
+    c.perform("add", 1, 2)
+    c.perform("divide", 1, 3)
+    c.save()
+    c2 = make_calc(tmp_path, monkeypatch)
+    c2.load()
+    report = c2.replay(max_workers=1)
+    assert (report.evaluated, report.skipped) == (0, 2)
+    forced = c2.replay(max_workers=1, force=True)
+    assert forced.evaluated == 2
+    assert c2.replay(max_workers=1, force=True).evaluated == 2
+    changed = c2.replay(replace(c2.cfg, precision=2), max_workers=1)
+    assert changed.evaluated == 2
+    assert c2.history[1].digest == calculation_digest("divide", Decimal(1), Decimal(3), replace(c2.cfg, precision=2))
+
+def test_replay_streams_in_chunks():
+    cfg = CalculatorConfig.load()
+    consumed = []
+    def source():
+        for n in range(5):
+            consumed.append(n)
+            yield Calculation("add", Decimal(n), Decimal(1), Decimal(0), "t")
+    report = replay_history(source(), cfg, max_workers=1, chunksize=2)
+    assert consumed == list(range(5))
+    assert [c.result for c in report.history] == [Decimal(n + 1).quantize(Decimal("1e-8")) for n in range(5)]
+    assert [ch.index for ch in report.changes] == list(range(5))
+
+def test_replay_empty_file(tmp_path, monkeypatch):
+    c = make_calc(tmp_path, monkeypatch)
+    empty = tmp_path / "empty.csv"
+    empty.write_text("")
+    with pytest.raises(CalculatorError):
+        c.replay(source=empty, max_workers=1)
@@ -0,0 +1,200 @@
+import copy
+import pytest
+from dataclasses import replace
+from decimal import Decimal
+from app.calculator import Calculator
+from app.calculator_config import CalculatorConfig
+from app.exceptions import ValidationError
+from app.operations import OperationFactory
+from app.result_cache import ResultCache
+from app.sessions import SessionManager
+
+@pytest.fixture(autouse=True)
+def tmp_dirs(tmp_path, monkeypatch):
+    monkeypatch.setenv("CALCULATOR_HISTORY_DIR", str(tmp_path))
+    monkeypatch.setenv("CALCULATOR_LOG_DIR", str(tmp_path))
+
+def make_manager(tmp_path, budget=10**9, auto_save=True):
+    cfg = replace(CalculatorConfig.load(), history_dir=tmp_path, log_dir=tmp_path, auto_save=auto_save)
+    return SessionManager(cfg, memory_budget=budget)
+
+def test_sessions_share_state(tmp_path):
+    m = make_manager(tmp_path)
+    a, b = m.get("alice"), m.get("bob")
+    assert a.cfg is b.cfg
+    assert m._sessions["alice"]._result_cache is m._sessions["bob"]._result_cache is m.result_cache
+    a.perform("add", 1, 2)
+    assert len(m.result_cache) == 1
+    assert b.history == []
+    assert len(m.get("alice").history) == 1
+    assert m.resident_sessions == ["bob", "alice"]
+
+def test_operation_singletons():
+    assert OperationFactory.create("add") is OperationFactory.create("add")
+
+def test_evict_and_rehydrate(tmp_path):
+    m = make_manager(tmp_path)
+    c = m.get("alice")
+    c.perform("add", 1, 2)
+    c.perform("multiply", 3, 4)
+    c.undo()
+    before = (c.history, c.dump_state()["future"][0].history)
+    m.evict("alice")
+    assert m.resident_sessions == []
+    assert (tmp_path / "sessions" / "alice.json").exists()
+    assert (c.history, c.dump_state()["future"][0].history) == before
+    assert not (tmp_path / "sessions" / "alice.json").exists()
+    assert c.redo() is True
+    assert len(c.history) == 2
+
+def test_spill_file_is_linear(tmp_path):
+    m = make_manager(tmp_path, auto_save=False)
+    sizes = []
+    for sid, n in (("small", 200), ("large", 400)):
+        s = m.get(sid)
+        for i in range(n):
+            s.perform("add", i, 1)
+        s.undo()
+        m.evict(sid)
+        sizes.append((tmp_path / "sessions" / f"{sid}.json").stat().st_size)
+    assert sizes[1] < 2.2 * sizes[0]
+
+def test_handle_survives_eviction(tmp_path):
+    m = make_manager(tmp_path, budget=1)
+    a = m.get("a")
+    a.perform("add", 1, 1)
+    m.get("b")
+    assert m.resident_sessions == ["b"]
+    a.perform("add", 2, 2)
+    assert len(a.history) == 2
+    assert m.resident_sessions == ["a"]
+
+def test_lru_eviction_under_budget(tmp_path):
+    m = make_manager(tmp_path, budget=1)
+    m.get("alice").perform("add", 1, 2)
+    m.get("bob").perform("add", 3, 4)
+    m.get("carol")
+    assert m.resident_sessions == ["carol"]
+    assert len(m.get("alice").history) == 1
+    assert "alice" in m.resident_sessions
+
+def test_handle_copy_and_private_names(tmp_path):
+    m = make_manager(tmp_path)
+    a = m.get("a")
+    b = copy.copy(a)
+    b.perform("add", 1, 1)
+    assert len(a.history) == 1
+    with pytest.raises(AttributeError):
+        a._history
+
+def test_session_autosaves_to_own_file(tmp_path):
+    m = make_manager(tmp_path)
+    m.get("alice").perform("add", 1, 2)
+    assert (tmp_path / "sessions" / "alice.csv").exists()
+    assert not m.cfg.history_file.exists()
+
+def test_calculator_autosaves_to_history_file(tmp_path):
+    target = tmp_path / "mine.csv"
+    c = Calculator(CalculatorConfig.load(), history_file=target)
+    c.perform("add", 1, 2)
+    assert target.exists()
+    assert not c.cfg.history_file.exists()
+
+def test_session_saves_to_own_file(tmp_path):
+    m = make_manager(tmp_path)
+    s = m.get("alice")
+    s.perform("add", 1, 2)
+    s.replay(replace(m.cfg, precision=2), max_workers=1)
+    s.save()
+    assert (tmp_path / "sessions" / "alice.csv").exists()
+    assert not m.cfg.history_file.exists()
+
+def test_memory_report(tmp_path):
+    m = make_manager(tmp_path)
+    m.get("alice").perform("add", 1, 2)
+    m.get("bob")
+    report = m.memory_report()
+    assert list(report) == ["alice", "bob"]
+    assert report["alice"] > report["bob"] > 0
+    assert m.total_memory() == sum(report.values()) + m.result_cache.memory_footprint()
+    m.evict("nobody")
+    m.evict_all()
+    assert m.memory_report() == {}
+
+def test_memory_footprint_tracks_changes(tmp_path):
+    c = Calculator(replace(CalculatorConfig.load(), auto_save=False))
+    empty = c.memory_footprint()
+    c.perform("add", 1, 2)
+    c.perform("add", 2, 3)
+    grown = c.memory_footprint()
+    assert grown > empty
+    c.undo()
+    c.redo()
+    c.clear()
+    assert c.memory_footprint() > grown
+    state = c.dump_state()
+    footprint = c.memory_footprint()
+    c.load_state(state)
+    assert c.memory_footprint() == footprint
+
+def test_memory_footprint_drops_with_redo_stack(tmp_path):
+    c = Calculator(replace(CalculatorConfig.load(), auto_save=False))
+    for i in range(300):
+        c.perform("add", i, 1)
+    for _ in range(300):
+        c.undo()
+    c.perform("add", 1, 1)
+    running = c.memory_footprint()
+    c.load_state(c.dump_state())
+    assert running == c.memory_footprint()
+    assert running < 5000
+
+def test_undo_snapshots_are_linear(tmp_path):
+    sizes = []
+    for n in (500, 1000):
+        c = Calculator(replace(CalculatorConfig.load(), auto_save=False))
+        for i in range(n):
+            c.perform("add", i, 1)
+        sizes.append(c.memory_footprint())
+    assert sizes[1] < 2.2 * sizes[0]
+
+def test_undo_then_perform_keeps_snapshots(tmp_path):
+    c = Calculator(replace(CalculatorConfig.load(), auto_save=False))
+    for i in range(3):
+        c.perform("add", i, 0)
+    c.undo()
+    c.undo()
+    c.redo()
+    c.perform("add", 9, 0)
+    assert [x.a for x in c.history] == [0, 1, 9]
+    c.undo()
+    c.undo()
+    assert [x.a for x in c.history] == [0]
+    c.redo()
+    c.redo()
+    assert [x.a for x in c.history] == [0, 1, 9]
+    c.clear()
+    c.perform("add", 5, 0)
+    c.undo()
+    c.undo()
+    c.perform("add", 7, 0)
+    assert [x.a for x in c.history] == [0, 1, 9, 7]
+    running = c.memory_footprint()
+    c.load_state(c.dump_state())
+    assert running == c.memory_footprint()
+
+def test_result_cache_is_bounded():
+    cache = ResultCache(max_entries=2)
+    for k in ("a", "b", "c"):
+        cache[k] = Decimal(1)
+    assert "a" not in cache and len(cache) == 2
+    assert cache.get("b") == Decimal(1)
+    cache["b"] = Decimal(2)
+    cache["d"] = Decimal(3)
+    assert "c" not in cache and "b" in cache
+    assert cache.memory_footprint() > 0
+
+def test_invalid_session_id(tmp_path):
+    m = make_manager(tmp_path)
+    with pytest.raises(ValidationError):
+        m.get("../etc")